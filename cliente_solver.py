@@ -0,0 +1,102 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+URL_SERVICO = os.environ.get("SOLVER_URL", "http://127.0.0.1:8765")
+MARGEM_TEMPO = 5  # Folga (s) além do tempo limite do job antes de o cliente desistir
+FATOR_ESPERA_FILA = 1  # Espera máxima na fila, em múltiplos do tempo limite do job
+
+
+class ErroServicoSolver(Exception):
+    pass
+
+
+def _requisitar(metodo, caminho, dados=None, url_servico=URL_SERVICO, timeout=10):
+    corpo = None if dados is None else json.dumps(dados).encode("utf-8")
+    requisicao = urllib.request.Request(
+        url_servico + caminho,
+        data=corpo,
+        method=metodo,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+            return json.loads(resposta.read())
+    except urllib.error.HTTPError as e:
+        try:
+            mensagem = json.loads(e.read()).get("erro", str(e))
+        except ValueError:
+            mensagem = str(e)
+        raise ErroServicoSolver(mensagem) from e
+    except (OSError, ValueError) as e:
+        # Serviço fora do ar, conexão interrompida ou resposta que não é JSON
+        raise ErroServicoSolver(f"Falha na comunicação com o serviço: {e}") from e
+
+
+def servico_disponivel(url_servico=URL_SERVICO):
+    try:
+        return _requisitar("GET", "/saude", url_servico=url_servico, timeout=1)["status"] == "ok"
+    except (ErroServicoSolver, KeyError):
+        return False
+
+
+def enviar_job(aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=None, candidatos=None, prioridade=10, url_servico=URL_SERVICO):
+    """
+    Envia um job ao serviço e retorna {'job_id', 'status', 'duplicado'}
+    sem esperar a resolução.
+    """
+    dados = {
+        "aeroporto_inicio": aeroporto_inicio,
+        "tipo_busca": tipo_busca,
+        "tempo_limite": tempo_limite,
+        # JSON não tem infinito: None significa "sem budget"
+        "budget_inicial": None if budget_inicial is None or budget_inicial == float("inf") else budget_inicial,
+        "candidatos": candidatos,
+        "prioridade": prioridade,
+    }
+    return _requisitar("POST", "/jobs", dados, url_servico=url_servico)
+
+
+def consultar_job(job_id, url_servico=URL_SERVICO):
+    return _requisitar("GET", f"/jobs/{job_id}", url_servico=url_servico)
+
+
+def aguardar_job(job_id, prazo=None, prazo_total=None, intervalo=0.1, url_servico=URL_SERVICO):
+    """
+    Consulta o job até ele terminar. Retorna o dicionário de resultado do
+    B&B (mesmo formato de rodar_branch_and_bound). 'prazo' (s) conta a partir
+    do início da execução no serviço; 'prazo_total' (s) conta desde a chamada,
+    incluindo o tempo de espera na fila.
+    """
+    limite = None
+    limite_total = None if prazo_total is None else time.monotonic() + prazo_total
+    while True:
+        job = consultar_job(job_id, url_servico=url_servico)
+        if job["status"] == "concluido":
+            return job["resultado"]
+        if job["status"] == "erro":
+            raise ErroServicoSolver(job["erro"])
+
+        if job["status"] == "executando" and prazo is not None:
+            if limite is None:
+                limite = time.monotonic() + prazo
+            elif time.monotonic() > limite:
+                raise ErroServicoSolver(f"Job {job_id} não terminou dentro do prazo de {prazo:.0f}s.")
+        if limite_total is not None and time.monotonic() > limite_total:
+            raise ErroServicoSolver(f"Job {job_id} não terminou dentro do prazo total de {prazo_total:.0f}s (status: {job['status']}).")
+        time.sleep(intervalo)
+
+
+def resolver_remoto(aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=None, candidatos=None, prioridade=10, espera_fila=None, url_servico=URL_SERVICO):
+    """
+    Envia o job e aguarda o resultado. 'espera_fila' (s) limita o tempo na
+    fila do serviço (padrão: tempo_limite * FATOR_ESPERA_FILA).
+    """
+    if espera_fila is None:
+        espera_fila = tempo_limite * FATOR_ESPERA_FILA
+    prazo = tempo_limite + MARGEM_TEMPO
+
+    job = enviar_job(aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial, candidatos, prioridade, url_servico)
+    return aguardar_job(job["job_id"], prazo=prazo, prazo_total=espera_fila + prazo, url_servico=url_servico)
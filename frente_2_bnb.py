@@ -5,7 +5,7 @@ from collections import deque
 
 
 class TspSolver:
-    def __init__(self, matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=np.inf):
+    def __init__(self, matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=np.inf, candidatos=None):
         self.aeroportos = matriz_custos.index.tolist()
         self.matriz = matriz_custos.to_numpy()
         self.lookup = {nome: i for i, nome in enumerate(self.aeroportos)}
@@ -22,9 +22,28 @@ class TspSolver:
         self.nos_explorados = 0
         self.start_time = time.time()
 
+        # Listas de vizinhos candidatos (ex: k-NN do indice_espacial.py).
+        # Sem listas, todas as arestas saindo de 'u' são avaliadas.
+        if candidatos is None:
+            self.candidatos = [range(self.N)] * self.N
+        else:
+            self.candidatos = [
+                [self.lookup[v] for v in candidatos.get(nome, []) if v in self.lookup]
+                for nome in self.aeroportos
+            ]
+
     def _converter_indices_para_nomes(self, indices):
         return [self.aeroportos[i] for i in indices]
 
+    def _vizinhos(self, u, visitados_mask):
+        # Igual à heurística: se nenhum candidato de 'u' ainda é alcançável,
+        # usa todas as arestas, para que listas candidatas (k-NN) separadas
+        # em grupos geográficos não deixem a busca sem rota completa.
+        for v in self.candidatos[u]:
+            if not visitados_mask[v] and self.matriz[u, v] != np.inf:
+                return self.candidatos[u]
+        return range(self.N)
+
     def _calcular_custo(self, rota_indices):
         custo = 0
         for i in range(len(rota_indices) - 1):
@@ -86,7 +105,7 @@ class TspSolver:
                     self.melhor_rota_indices = rota_parcial_indices + [self.start_node_idx]
             return
 
-        for v in range(self.N):
+        for v in self._vizinhos(u, visitados_mask):
             if not visitados_mask[v] and self.matriz[u, v] != np.inf:
                 visitados_mask[v] = True
                 self._rodar_dfs_recursivo(v, rota_parcial_indices + [v], custo_parcial + self.matriz[u, v], visitados_mask)
@@ -119,7 +138,7 @@ class TspSolver:
                         self.melhor_rota_indices = rota + [self.start_node_idx]
                 continue
 
-            for v in range(self.N):
+            for v in self._vizinhos(u, visitados):
                 if not visitados[v] and self.matriz[u, v] != np.inf:
                     novo_visitados = visitados.copy()
                     novo_visitados[v] = True
@@ -152,12 +171,12 @@ class TspSolver:
                         self.melhor_rota_indices = rota + [self.start_node_idx]
                 continue
 
-            for v in range(self.N):
+            for v in self._vizinhos(u, visitados):
                 if not visitados[v] and self.matriz[u, v] != np.inf:
                     novo_visitados = visitados.copy()
                     novo_visitados[v] = True
                     heapq.heappush(heap, (custo + self.matriz[u, v], v, rota + [v], novo_visitados))
 
-def rodar_branch_and_bound(matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=np.inf):
-    solver = TspSolver(matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial)
+def rodar_branch_and_bound(matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial=np.inf, candidatos=None):
+    solver = TspSolver(matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial, candidatos)
     return solver.resolver()
@@ -0,0 +1,195 @@
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+RAIO_TERRA_KM = 6371  # Mesmo raio usado no haversine de matriz_custos.py
+
+
+def carregar_aeroportos(caminho="datasets/airport.csv"):
+    """
+    Carrega o CSV de aeroportos e devolve um DataFrame indexado por IATA
+    com as colunas latitude e longitude (sem nulos e sem IATA repetido).
+    """
+    df_airports = pd.read_csv(caminho)
+    df_airports = df_airports.replace([r"\\N", r"\\n"], value=np.nan, regex=True)
+
+    df_coords = df_airports[["iata", "latitude", "longitude"]].dropna()
+    df_coords = df_coords.drop_duplicates(subset="iata")
+    return df_coords.set_index("iata")
+
+
+class IndiceAeroportos:
+    """
+    Índice espacial (BallTree com métrica haversine) sobre os aeroportos.
+
+    Responde consultas de k vizinhos mais próximos, de aeroportos dentro de
+    um raio (em km) e de "snap" para o hub mais próximo, sem precisar
+    calcular a distância par a par com o haversine.
+    """
+
+    def __init__(self, df_coords):
+        self.iatas = df_coords.index.tolist()
+        self.lookup = {iata: i for i, iata in enumerate(self.iatas)}
+        # O BallTree com métrica haversine espera [lat, lon] em radianos
+        self.coords_rad = np.radians(df_coords[["latitude", "longitude"]].to_numpy(dtype=float))
+        self.arvore = BallTree(self.coords_rad, metric="haversine")
+        self._indices_hubs = {}  # tuple(hubs) -> IndiceAeroportos, montado uma única vez
+
+    @classmethod
+    def de_csv(cls, caminho="datasets/airport.csv"):
+        return cls(carregar_aeroportos(caminho))
+
+    def _ponto(self, origem):
+        # Aceita um código IATA ou uma tupla (latitude, longitude) em graus
+        if isinstance(origem, str):
+            return self.coords_rad[[self.lookup[origem]]]
+        return np.radians(np.asarray(origem, dtype=float).reshape(1, 2))
+
+    def vizinhos_mais_proximos(self, origem, k=5):
+        """
+        Retorna uma lista [(iata, distancia_km), ...] com os k aeroportos mais
+        próximos de 'origem' (IATA ou (lat, lon)). O próprio aeroporto de
+        origem não entra na lista quando ela é um IATA.
+        """
+        excluir_origem = isinstance(origem, str)
+        k_busca = min(k + int(excluir_origem), len(self.iatas))
+
+        dist, ind = self.arvore.query(self._ponto(origem), k=k_busca)
+
+        vizinhos = [
+            (self.iatas[i], d * RAIO_TERRA_KM)
+            for d, i in zip(dist[0], ind[0])
+            if not (excluir_origem and self.iatas[i] == origem)
+        ]
+        return vizinhos[:k]
+
+    def aeroportos_no_raio(self, origem, raio_km):
+        """
+        Retorna todos os aeroportos a até 'raio_km' de 'origem', ordenados
+        pela distância: [(iata, distancia_km), ...]. Assim como em
+        'vizinhos_mais_proximos', o próprio aeroporto de origem não entra na
+        lista quando ela é um IATA.
+        """
+        ind, dist = self.arvore.query_radius(
+            self._ponto(origem), r=raio_km / RAIO_TERRA_KM, return_distance=True, sort_results=True
+        )
+        return [
+            (self.iatas[i], d * RAIO_TERRA_KM)
+            for d, i in zip(dist[0], ind[0])
+            if not (isinstance(origem, str) and self.iatas[i] == origem)
+        ]
+
+    def indice_hubs(self, hubs):
+        """
+        Retorna o índice (em cache) sobre os hubs. Hubs fora do índice são
+        ignorados; se nenhum sobrar, levanta ValueError.
+        """
+        hubs = list(hubs)  # Aceita iteradores, que seriam consumidos por tuple()
+        chave = tuple(hubs)
+        if chave not in self._indices_hubs:
+            df_hubs = self._subconjunto(hubs)
+            if df_hubs.empty:
+                raise ValueError(f"Nenhum dos hubs informados está no índice: {hubs}")
+            self._indices_hubs[chave] = IndiceAeroportos(df_hubs)
+        return self._indices_hubs[chave]
+
+    def hub_mais_proximo(self, origem, hubs):
+        """
+        Faz o "snap" de 'origem' para o hub mais próximo dentre a lista 'hubs'.
+        Retorna (iata_hub, distancia_km).
+        """
+        return self.indice_hubs(hubs).vizinhos_mais_proximos(self._coordenadas(origem), k=1)[0]
+
+    def ajustar_aos_hubs(self, iatas, hubs):
+        """
+        Versão em lote de 'hub_mais_proximo': devolve um dicionário
+        {iata: (iata_hub, distancia_km)}.
+        """
+        indice_hubs = self.indice_hubs(hubs)
+        pontos = self.coords_rad[[self.lookup[iata] for iata in iatas]]
+
+        dist, ind = indice_hubs.arvore.query(pontos, k=1)
+        return {
+            iata: (indice_hubs.iatas[i], d * RAIO_TERRA_KM)
+            for iata, d, i in zip(iatas, dist[:, 0], ind[:, 0])
+        }
+
+    def listas_candidatas(self, iatas, k=5):
+        """
+        Gera as listas de vizinhos candidatos {iata: [iata_vizinho, ...]},
+        considerando apenas os aeroportos de 'iatas' (ex: os da matriz de
+        custos). Essas listas limitam quais arestas o B&B e a heurística
+        avaliam a partir de cada aeroporto; quando nenhum candidato ainda é
+        alcançável, ambos voltam a considerar todas as arestas.
+        """
+        indice_local = IndiceAeroportos(self._subconjunto(iatas))
+        k_busca = min(k + 1, len(indice_local.iatas))
+
+        _, ind = indice_local.arvore.query(indice_local.coords_rad, k=k_busca)
+
+        candidatos = {}
+        for i, linha in enumerate(ind):
+            origem = indice_local.iatas[i]
+            vizinhos = [indice_local.iatas[j] for j in linha if j != i]
+            candidatos[origem] = vizinhos[:k]
+        return candidatos
+
+    def _coordenadas(self, origem):
+        if isinstance(origem, str):
+            return tuple(np.degrees(self.coords_rad[self.lookup[origem]]))
+        return origem
+
+    def _subconjunto(self, iatas):
+        iatas = [iata for iata in iatas if iata in self.lookup]
+        coords = np.degrees(self.coords_rad[[self.lookup[iata] for iata in iatas]])
+        return pd.DataFrame(coords, index=iatas, columns=["latitude", "longitude"])
+
+
+def benchmark_indice(caminho="datasets/airport.csv", n_consultas=1000, k=10, raio_km=500):
+    """
+    Mede o tempo de construção do índice e a latência média por consulta
+    sobre o conjunto completo de aeroportos.
+    """
+    df_coords = carregar_aeroportos(caminho)
+
+    inicio = time.perf_counter()
+    indice = IndiceAeroportos(df_coords)
+    tempo_construcao = time.perf_counter() - inicio
+
+    rng = np.random.default_rng(0)
+    amostra = rng.choice(indice.iatas, size=min(n_consultas, len(indice.iatas)), replace=False)
+
+    inicio = time.perf_counter()
+    for iata in amostra:
+        indice.vizinhos_mais_proximos(iata, k=k)
+    tempo_knn = (time.perf_counter() - inicio) / len(amostra)
+
+    inicio = time.perf_counter()
+    for iata in amostra:
+        indice.aeroportos_no_raio(iata, raio_km)
+    tempo_raio = (time.perf_counter() - inicio) / len(amostra)
+
+    inicio = time.perf_counter()
+    indice.listas_candidatas(indice.iatas, k=k)
+    tempo_candidatos = time.perf_counter() - inicio
+
+    print("--- Benchmark do Índice Espacial (BallTree haversine) ---")
+    print(f"Aeroportos indexados: {len(indice.iatas)}")
+    print(f"Construção do índice: {tempo_construcao * 1000:.2f} ms")
+    print(f"Consulta k-NN (k={k}): {tempo_knn * 1e6:.1f} µs/consulta")
+    print(f"Consulta por raio ({raio_km} km): {tempo_raio * 1e6:.1f} µs/consulta")
+    print(f"Listas candidatas para todos (k={k}): {tempo_candidatos * 1000:.2f} ms")
+
+    return {
+        "n_aeroportos": len(indice.iatas),
+        "tempo_construcao": tempo_construcao,
+        "tempo_knn": tempo_knn,
+        "tempo_raio": tempo_raio,
+        "tempo_candidatos": tempo_candidatos,
+    }
+
+
+if __name__ == "__main__":
+    benchmark_indice()
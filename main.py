@@ -1,15 +1,21 @@
+import os
 import time
 import numpy as np
 import pandas as pd
 import streamlit as st
 from dados import gerar_dados
-from matriz_custos import gerar_matriz_custos
+from matriz_custos import gerar_matriz_custos, carregar_matriz_binaria
 from frente_2_bnb import rodar_branch_and_bound
-import folium
-from streamlit_folium import st_folium
+from indice_espacial import IndiceAeroportos
+from cliente_solver import ErroServicoSolver, resolver_remoto, servico_disponivel
+import streamlit.components.v1 as components
+from mapa_rota import hash_rota, renderizar_mapa_html, zoom_para_extensao
 
 gerar_dados()
-gerar_matriz_custos()
+# A matriz só é gerada se ainda não existir: regravá-la a cada rerun trocaria
+# o arquivo que outras sessões e os workers do serviço já têm mapeado.
+if not os.path.exists("matriz_custos.bin"):
+    gerar_matriz_custos()
 
 # --- Configuração da Página ---
 st.set_page_config(layout="wide", page_title="Otimizador de Rotas (B&B)")
@@ -20,8 +26,14 @@ st.write(
 )
 
 # --- DADOS: Carregar a matriz de custos ---
-@st.cache_data
+# cache_resource (e não cache_data) para que todas as sessões compartilhem o
+# mesmo DataFrame apoiado no np.memmap, em vez de uma cópia serializada cada.
+@st.cache_resource
 def carregar_dados():
+    try:
+        return carregar_matriz_binaria("matriz_custos.bin")
+    except FileNotFoundError:
+        pass
     try:
         matriz = pd.read_csv("matriz_custos.csv", index_col=0)
         matriz = matriz.replace("inf", np.inf)
@@ -53,9 +65,39 @@ def carregar_coordenadas():
         return {}
 
 
-def rodar_vizinho_mais_proximo(matriz_custos, aeroporto_inicio):
+# --- ÍNDICE ESPACIAL (BallTree) E LISTAS CANDIDATAS ---
+@st.cache_resource
+def carregar_indice_espacial():
+    try:
+        return IndiceAeroportos.de_csv("datasets/airport.csv")
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_data
+def carregar_candidatos(iatas, k):
+    """
+    Gera as listas {IATA: [k vizinhos mais próximos]} restritas aos
+    aeroportos da matriz. Retorna None quando k == 0 (todas as arestas).
+    """
+    indice = carregar_indice_espacial()
+    if indice is None or k == 0:
+        return None
+    return indice.listas_candidatas(list(iatas), k=k)
+
+
+# --- MAPA DA ROTA: HTML em cache pelo hash da rota ---
+# Os argumentos com '_' não entram no hash do Streamlit: a chave é só 'chave_rota'.
+@st.cache_data(max_entries=32)
+def carregar_html_mapa(chave_rota, _lista_iatas, _coords, _zoom):
+    return renderizar_mapa_html(_lista_iatas, _coords, _zoom)
+
+
+def rodar_vizinho_mais_proximo(matriz_custos, aeroporto_inicio, candidatos=None):
     """
     Executa a heurística do Vizinho Mais Próximo (Nearest Neighbor).
+    Se 'candidatos' for informado, só as arestas para os vizinhos candidatos
+    são consideradas; quando todos já foram visitados, usa a linha inteira.
     """
     start_time = time.time()
     
@@ -78,6 +120,14 @@ def rodar_vizinho_mais_proximo(matriz_custos, aeroporto_inicio):
     for _ in range(N - 1):
         custos_vizinhos = matriz[atual_idx, :].copy()
         custos_vizinhos[visitados] = np.inf
+
+        if candidatos is not None:
+            mascara = np.ones(N, dtype=bool)
+            mascara[[lookup[v] for v in candidatos.get(aeroportos[atual_idx], []) if v in lookup]] = False
+            custos_candidatos = custos_vizinhos.copy()
+            custos_candidatos[mascara] = np.inf
+            if np.isfinite(custos_candidatos).any():
+                custos_vizinhos = custos_candidatos
         
         proximo_idx = np.argmin(custos_vizinhos)
         
@@ -131,7 +181,7 @@ with tab1:
 
     if matriz_custos is None:
         st.error(
-            "Erro: Arquivo `matriz_custos.csv` não encontrado. Verifique se ele está na pasta correta."
+            "Erro: Arquivo `matriz_custos.bin` (ou `matriz_custos.csv`) não encontrado. Verifique se ele está na pasta correta."
         )
     else:
         st.subheader("Matriz de Custos (em KM)")
@@ -194,6 +244,14 @@ with tab2:
             help="Defina um teto de custo inicial. O B&B podará rotas que excedam isso."
         )
 
+        k_candidatos = st.number_input(
+            "Vizinhos Candidatos (k):",
+            min_value=0,
+            max_value=max(len(matriz_custos.index) - 1, 0) if matriz_custos is not None else 0,
+            value=0,
+            help="Limita as arestas avaliadas aos k aeroportos geograficamente mais próximos (índice BallTree). 0 = todas as arestas."
+        )
+
         submitted = st.form_submit_button("▶️ Rodar Algoritmo B&B")
 
     if submitted:
@@ -201,12 +259,26 @@ with tab2:
             f"Executando B&B e Heurística... (Iniciando em: {aeroporto_inicio}, Busca: {tipo_busca}, Limite: {tempo_limite}s, Budget: {budget_inicial}km)"
         )
         with st.spinner("Calculando melhor rota... Isso pode demorar."):
-            resultado_bnb = rodar_branch_and_bound(
-                matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial
-            )
+            candidatos = carregar_candidatos(tuple(matriz_custos.index), int(k_candidatos))
+
+            # Com o serviço local (servico_solver.py) rodando, o B&B é executado no
+            # pool de workers compartilhado; senão, roda nesta própria sessão.
+            resultado_bnb = None
+            if servico_disponivel():
+                try:
+                    resultado_bnb = resolver_remoto(
+                        aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial, candidatos
+                    )
+                except ErroServicoSolver as e:
+                    st.warning(f"Erro no serviço do solver ({e}). Executando localmente.")
+
+            if resultado_bnb is None:
+                resultado_bnb = rodar_branch_and_bound(
+                    matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite, budget_inicial, candidatos
+                )
             
             resultado_heuristica = rodar_vizinho_mais_proximo(
-                matriz_custos, aeroporto_inicio
+                matriz_custos, aeroporto_inicio, candidatos
             )
 
         st.success("Execução concluída!")
@@ -318,23 +390,12 @@ with tab3:
                 st.warning(f"Não foi possível encontrar coordenadas para: {', '.join(iatas_nao_encontrados)}")
 
             if lista_coords:
-                mapa = folium.Map(location=lista_coords[0], zoom_start=3)
-                
-                for iata, coords in zip(lista_iatas, lista_coords):
-                    folium.Marker(
-                        location=coords,
-                        popup=f"Aeroporto: {iata}",
-                        tooltip=iata
-                    ).add_to(mapa)
-                
-                folium.PolyLine(
-                    locations=lista_coords,
-                    color="red",
-                    weight=2,
-                    tooltip="Rota Ótima"
-                ).add_to(mapa)
-                
-                st_folium(mapa, width=700, height=400)
+                # HTML em cache por hash da rota: reruns da aba não remontam o mapa
+                lista_iatas_encontrados = [iata for iata in lista_iatas if iata in COORDENADAS]
+                zoom = zoom_para_extensao(lista_coords)
+                chave_rota = hash_rota(lista_iatas_encontrados, lista_coords, zoom)
+                html_mapa = carregar_html_mapa(chave_rota, lista_iatas_encontrados, lista_coords, zoom)
+                components.html(html_mapa, width=700, height=400)
         
         else:
             st.info("Não é possível exibir o mapa, pois nenhuma rota foi encontrada (custo infinito).")
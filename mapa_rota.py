@@ -0,0 +1,187 @@
+import hashlib
+import json
+
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster
+
+LIMITE_MARCADORES = 50  # Acima disso, os aeroportos viram uma única camada de cluster
+MAX_PONTOS_ARCO = 128  # Teto de pontos por arco de grande círculo
+ZOOM_DETALHE = 6  # Densidade da linha enviada ao navegador (passo de 0,25° por arco)
+SUAVIZACAO = 1.5  # smoothFactor do Leaflet: tolerância (px) da simplificação feita a cada zoom
+
+
+def _extensao_longitude(lon):
+    """
+    Largura (graus) do menor intervalo de longitudes que cobre todos os
+    pontos: 360° menos o maior vão entre longitudes vizinhas (considerando a
+    volta pelo antimeridiano).
+    """
+    lon = np.sort(np.asarray(lon, dtype=float))
+    vaos = np.diff(np.append(lon, lon[0] + 360))
+    return 360 - vaos.max()
+
+
+def centro_geografico(coords):
+    """
+    Centro das coordenadas [(lat, lon), ...] pela média dos vetores unitários
+    na esfera, para que rotas que cruzam o antimeridiano (ex: HND -> LAX)
+    fiquem centradas no Pacífico e não do outro lado do mundo.
+    """
+    coords = np.asarray(coords, dtype=float)
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    x, y, z = np.mean([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+    return [float(np.degrees(np.arctan2(z, np.hypot(x, y)))), float(np.degrees(np.arctan2(y, x)))]
+
+
+def zoom_para_extensao(coords):
+    """
+    Estima o nível de zoom do Leaflet que enquadra as coordenadas [(lat, lon), ...].
+    """
+    coords = np.asarray(coords, dtype=float)
+    extensao = max(np.ptp(coords[:, 0]) * 2, _extensao_longitude(coords[:, 1]), 1e-6)
+    return int(np.clip(np.floor(np.log2(360 / extensao)), 1, 18))
+
+
+def pontos_por_arco(angulos_graus, zoom):
+    """
+    Define quantos pontos cada arco recebe: em zoom baixo um ponto a cada
+    poucos graus basta; a cada nível de zoom o passo cai pela metade.
+    """
+    passo_graus = 16 / 2 ** zoom
+    n = np.ceil(angulos_graus / passo_graus).astype(int) + 1
+    return np.clip(n, 2, MAX_PONTOS_ARCO)
+
+
+def arcos_grande_circulo(coords, zoom=3):
+    """
+    Calcula (vetorizado em NumPy) a geometria de grande círculo entre
+    aeroportos consecutivos da rota, já amostrada conforme o zoom.
+    Retorna uma lista de segmentos (arrays (P, 2) com [lat, lon]): a linha é
+    quebrada ao cruzar o antimeridiano, e as longitudes ficam em [-180, 180],
+    no mesmo "mundo" dos marcadores.
+    """
+    coords = np.asarray(coords, dtype=float)
+    if len(coords) < 2:
+        return [coords]
+
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    # Vetores unitários na esfera
+    xyz = np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+    a, b = xyz[:-1], xyz[1:]
+    omega = np.arccos(np.clip(np.einsum("ij,ij->i", a, b), -1.0, 1.0))
+
+    n = pontos_por_arco(np.degrees(omega), zoom)
+    # Cada arco i recebe n[i] valores de t em [0, 1]; o último ponto de um arco
+    # é o primeiro do seguinte, então ele só é mantido no último arco.
+    n_usados = n - 1
+    n_usados[-1] += 1
+    arco = np.repeat(np.arange(len(n)), n_usados)
+    posicao = np.arange(len(arco)) - np.repeat(np.cumsum(n_usados) - n_usados, n_usados)
+    t = (posicao / (n[arco] - 1))[:, None]
+
+    # Interpolação esférica (slerp); arcos degenerados (omega ~ 0) viram interpolação linear
+    om = omega[arco][:, None]
+    sen_om = np.sin(om)
+    degenerado = sen_om < 1e-12
+    sen_om = np.where(degenerado, 1.0, sen_om)
+    peso_a = np.where(degenerado, 1 - t, np.sin((1 - t) * om) / sen_om)
+    peso_b = np.where(degenerado, t, np.sin(t * om) / sen_om)
+    p = peso_a * a[arco] + peso_b * b[arco]
+
+    lat_arco = np.degrees(np.arctan2(p[:, 2], np.hypot(p[:, 0], p[:, 1])))
+    lon_arco = np.degrees(np.arctan2(p[:, 1], p[:, 0]))
+    return _dividir_no_antimeridiano(lat_arco, lon_arco)
+
+
+def _dividir_no_antimeridiano(lat, lon):
+    """
+    Quebra a linha onde dois pontos seguidos saltam mais de 180° em longitude
+    (cruzamento do antimeridiano), fechando cada pedaço exatamente em ±180°.
+    """
+    pontos = np.column_stack([lat, lon])
+    quebras = np.flatnonzero(np.abs(np.diff(lon)) > 180)
+
+    segmentos = []
+    inicio = 0
+    ponto_inicial = None
+    for i in quebras:
+        # Longitude do ponto seguinte no mesmo "mundo" do ponto i, para interpolar a latitude
+        borda = 180.0 if lon[i] > 0 else -180.0
+        lon_seguinte = lon[i + 1] + 2 * borda
+        fracao = (borda - lon[i]) / (lon_seguinte - lon[i])
+        lat_cruzamento = lat[i] + fracao * (lat[i + 1] - lat[i])
+
+        trecho = [pontos[inicio:i + 1], [[lat_cruzamento, borda]]]
+        if ponto_inicial is not None:
+            trecho.insert(0, [ponto_inicial])
+        segmentos.append(np.vstack(trecho))
+
+        ponto_inicial = [lat_cruzamento, -borda]
+        inicio = i + 1
+
+    trecho = [pontos[inicio:]]
+    if ponto_inicial is not None:
+        trecho.insert(0, [ponto_inicial])
+    segmentos.append(np.vstack(trecho))
+    return segmentos
+
+
+def hash_rota(lista_iatas, coords, zoom):
+    dados = json.dumps([list(lista_iatas), np.round(coords, 6).tolist(), zoom])
+    return hashlib.sha1(dados.encode("utf-8")).hexdigest()
+
+
+def _montar_mapa(lista_iatas, coords, zoom):
+    mapa = folium.Map(location=centro_geografico(coords), zoom_start=zoom)
+
+    # A rota fecha no aeroporto inicial, que não precisa de um segundo marcador
+    aeroportos = list(dict.fromkeys(zip(lista_iatas, map(tuple, coords))))
+    if len(aeroportos) > LIMITE_MARCADORES:
+        # Camada única montada no navegador (bem mais leve que um Marker por aeroporto)
+        FastMarkerCluster(
+            data=[[lat, lon, iata] for iata, (lat, lon) in aeroportos],
+            callback="""
+            function (row) {
+                var marker = L.marker(new L.LatLng(row[0], row[1]));
+                marker.bindTooltip(row[2]);
+                marker.bindPopup('Aeroporto: ' + row[2]);
+                return marker;
+            };""",
+        ).add_to(mapa)
+    else:
+        for iata, (lat, lon) in aeroportos:
+            folium.Marker(
+                location=[lat, lon],
+                popup=f"Aeroporto: {iata}",
+                tooltip=iata
+            ).add_to(mapa)
+
+    # O HTML é estático: a linha vai densa (ZOOM_DETALHE) e o próprio Leaflet
+    # a simplifica a cada nível de zoom (smoothFactor), descartando pontos
+    # que ficariam a menos de SUAVIZACAO pixels entre si.
+    segmentos = arcos_grande_circulo(coords, ZOOM_DETALHE)
+    folium.PolyLine(
+        locations=[np.round(segmento, 5).tolist() for segmento in segmentos],
+        color="red",
+        weight=2,
+        smooth_factor=SUAVIZACAO,
+        tooltip="Rota Ótima"
+    ).add_to(mapa)
+
+    return mapa
+
+
+def renderizar_mapa_html(lista_iatas, coords, zoom=None):
+    """
+    Retorna o HTML do mapa da rota. 'zoom' é só o enquadramento inicial; sem
+    ele, é estimado pelas coordenadas da rota. O cache por hash da rota fica no main.py
+    (st.cache_data), compartilhado entre as sessões.
+    """
+    coords = np.asarray(coords, dtype=float)
+    if zoom is None:
+        zoom = zoom_para_extensao(coords)
+    return _montar_mapa(lista_iatas, coords, zoom).get_root().render()
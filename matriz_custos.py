@@ -1,7 +1,19 @@
+import json
+import os
+import struct
+import tempfile
+
 import numpy as np
 import pandas as pd
 from math import radians, sin, cos, sqrt, atan2
 
+# --- Formato binário da matriz (matriz_custos.bin) ---
+# [MAGIC (8 bytes)] [tamanho do cabeçalho (uint32 LE)] [cabeçalho JSON com os IATAs]
+# [payload .npy float32/float64], com o payload alinhado em ALINHAMENTO bytes
+# para poder ser aberto com np.memmap (zero-cópia, páginas compartilhadas entre processos).
+MAGIC = b"MTZCUSTO"
+ALINHAMENTO = 64
+
 def haversine(lat1, lon1, lat2, lon2):
     """
     Calcula a distância (em km) entre dois pontos (lat/lon) na Terra
@@ -21,7 +33,7 @@ def haversine(lat1, lon1, lat2, lon2):
     distance = R * c
     return distance
 
-def gerar_matriz_custos():
+def gerar_matriz_custos(salvar_csv=True):
     
     # --- Carregar Datasets ---
     try:
@@ -118,5 +130,87 @@ def gerar_matriz_custos():
     print("\n--- MATRIZ DE CUSTOS (Baseada em KM) ---")
     print(matriz_custos.round(0))
 
-    matriz_custos.to_csv("matriz_custos.csv")
-    print("\nMatriz salva em matriz_custos.csv")
\ No newline at end of file
+    salvar_matriz_binaria(matriz_custos, "matriz_custos.bin")
+    print("\nMatriz salva em matriz_custos.bin")
+
+    if salvar_csv:
+        # CSV mantido apenas para inspeção manual
+        matriz_custos.to_csv("matriz_custos.csv")
+        print("Matriz exportada em matriz_custos.csv")
+
+
+def salvar_matriz_binaria(matriz_custos, caminho="matriz_custos.bin", dtype=np.float64):
+    """
+    Salva a matriz de custos (DataFrame) no formato binário: um cabeçalho com
+    os IATAs seguido do payload .npy. 'inf' é gravado como float, sem texto.
+    """
+    iatas = [str(iata) for iata in matriz_custos.index]
+    valores = np.ascontiguousarray(matriz_custos.to_numpy(dtype=dtype))
+
+    cabecalho = json.dumps({"iatas": iatas}).encode("utf-8")
+    # Preenche o cabeçalho com espaços para o payload .npy começar alinhado
+    inicio_npy = len(MAGIC) + 4 + len(cabecalho)
+    cabecalho += b" " * (-inicio_npy % ALINHAMENTO)
+
+    # Grava em um arquivo temporário no mesmo diretório e troca de forma atômica:
+    # truncar o arquivo original derrubaria (SIGBUS) quem já o tem mapeado com np.memmap.
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, caminho_tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(cabecalho)))
+            f.write(cabecalho)
+            np.lib.format.write_array(f, valores, allow_pickle=False)
+        # mkstemp cria o arquivo como 0600; aplica a umask como um open() comum
+        # faria, para que processos de outros usuários também possam mapeá-lo.
+        os.chmod(caminho_tmp, 0o666 & ~_umask_atual())
+        os.replace(caminho_tmp, caminho)
+    except BaseException:
+        os.remove(caminho_tmp)
+        raise
+
+
+def _umask_atual():
+    # os.umask só permite ler o valor trocando-o, então restaura em seguida
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def carregar_matriz_binaria(caminho="matriz_custos.bin"):
+    """
+    Abre a matriz binária com np.memmap em modo somente leitura e devolve um
+    DataFrame (IATA x IATA) que aponta para o mapeamento, sem copiar os dados.
+    """
+    with open(caminho, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{caminho}' não é uma matriz de custos binária.")
+
+        (tamanho_cabecalho,) = struct.unpack("<I", f.read(4))
+        iatas = json.loads(f.read(tamanho_cabecalho).decode("utf-8"))["iatas"]
+
+        versao = np.lib.format.read_magic(f)
+        if versao == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    valores = np.memmap(
+        caminho,
+        dtype=dtype,
+        mode="r",
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=offset,
+    )
+    return pd.DataFrame(valores, index=iatas, columns=iatas, copy=False)
+
+
+def exportar_matriz_csv(caminho_bin="matriz_custos.bin", caminho_csv="matriz_custos.csv"):
+    """
+    Converte a matriz binária para CSV, para inspeção manual.
+    """
+    carregar_matriz_binaria(caminho_bin).to_csv(caminho_csv)
+
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from frente_2_bnb import rodar_branch_and_bound
+from matriz_custos import carregar_matriz_binaria
+
+TIPOS_BUSCA = ["Profundidade (DFS)", "Largura (BFS)", "Melhor-Primeiro (Best-First)"]
+TEMPO_LIMITE_MAXIMO = 300  # Mesmo teto do formulário do main.py
+TTL_JOBS_CONCLUIDOS = 600  # Jobs concluídos ficam consultáveis por 10 minutos
+
+# --- Estado de cada processo worker ---
+_MATRIZ = None
+
+
+def _iniciar_worker(caminho_matriz):
+    """
+    Executado uma vez em cada processo do pool: abre a matriz via np.memmap,
+    de modo que todos os workers compartilham as mesmas páginas (somente leitura).
+    """
+    global _MATRIZ
+    _MATRIZ = carregar_matriz_binaria(caminho_matriz)
+
+
+def _resolver_job(params):
+    resultado = rodar_branch_and_bound(
+        _MATRIZ,
+        params["aeroporto_inicio"],
+        params["tipo_busca"],
+        params["tempo_limite"],
+        params["budget_inicial"],
+        params["candidatos"],
+    )
+    # Tipos do NumPy (ex: np.float32 de uma matriz float32) não são serializáveis em JSON
+    return {
+        "custo": float(resultado["custo"]),
+        "rota": resultado["rota"],
+        "tempo_execucao": float(resultado["tempo_execucao"]),
+        "nos_explorados": int(resultado["nos_explorados"]),
+    }
+
+
+class ServicoSolver:
+    """
+    Serviço local de resolução do TSP: recebe jobs via HTTP, ordena por
+    prioridade (menor valor = mais urgente), une requisições idênticas em
+    andamento e executa o B&B em um pool de processos com a matriz pré-carregada.
+    """
+
+    def __init__(self, caminho_matriz="matriz_custos.bin", n_workers=None):
+        self.caminho_matriz = caminho_matriz
+        self.matriz = carregar_matriz_binaria(caminho_matriz)
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+        # 'spawn' em vez de 'fork': os workers sobem sob demanda, já com o socket
+        # do servidor aberto, e com 'fork' herdariam a porta em LISTEN.
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_worker,
+            initargs=(caminho_matriz,),
+        )
+        self.fila = asyncio.PriorityQueue()
+        self.jobs = {}
+        self.em_andamento = {}  # chave da requisição -> job_id
+        self.sequencia = itertools.count()
+        self.despachantes = []
+
+    # =====================================================================
+    # JOBS
+    # =====================================================================
+    def _validar(self, dados):
+        aeroporto_inicio = dados.get("aeroporto_inicio")
+        if aeroporto_inicio not in self.matriz.index:
+            raise ValueError(f"Aeroporto de início inválido: {aeroporto_inicio}")
+
+        tipo_busca = dados.get("tipo_busca", TIPOS_BUSCA[0])
+        if tipo_busca not in TIPOS_BUSCA:
+            raise ValueError(f"Tipo de busca inválido: {tipo_busca}")
+
+        tempo_limite = float(dados.get("tempo_limite", 60))
+        if not tempo_limite > 0:
+            raise ValueError(f"Tempo limite deve ser positivo: {tempo_limite}")
+        tempo_limite = min(tempo_limite, TEMPO_LIMITE_MAXIMO)
+
+        candidatos = dados.get("candidatos")
+        if candidatos is not None and not (
+            isinstance(candidatos, dict)
+            and all(isinstance(vizinhos, list) for vizinhos in candidatos.values())
+        ):
+            raise ValueError("'candidatos' deve ser um objeto {IATA: [IATA, ...]}.")
+
+        budget_inicial = dados.get("budget_inicial")
+
+        return {
+            "aeroporto_inicio": aeroporto_inicio,
+            "tipo_busca": tipo_busca,
+            "tempo_limite": tempo_limite,
+            "budget_inicial": float("inf") if budget_inicial is None else float(budget_inicial),
+            "candidatos": candidatos,
+        }
+
+    def submeter(self, dados):
+        params = self._validar(dados)
+        prioridade = int(dados.get("prioridade", 10))
+        chave = json.dumps(params, sort_keys=True)
+
+        self._limpar_jobs_antigos()
+
+        # Requisição idêntica já em andamento: reaproveita o mesmo job
+        job_id = self.em_andamento.get(chave)
+        if job_id is not None:
+            job = self.jobs[job_id]
+            if job["status"] == "na_fila" and prioridade < job["prioridade"]:
+                # Reenfileira com a prioridade mais alta; a entrada antiga é ignorada
+                job["prioridade"] = prioridade
+                self.fila.put_nowait((prioridade, next(self.sequencia), job_id))
+            return {"job_id": job_id, "status": job["status"], "duplicado": True}
+
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            "status": "na_fila",
+            "prioridade": prioridade,
+            "params": params,
+            "chave": chave,
+            "criado_em": time.time(),
+            "concluido_em": None,
+            "resultado": None,
+            "erro": None,
+        }
+        self.em_andamento[chave] = job_id
+        self.fila.put_nowait((prioridade, next(self.sequencia), job_id))
+        return {"job_id": job_id, "status": "na_fila", "duplicado": False}
+
+    def consultar(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "prioridade": job["prioridade"],
+            "resultado": job["resultado"],
+            "erro": job["erro"],
+        }
+
+    def _finalizar(self, job_id, status, resultado=None, erro=None):
+        job = self.jobs[job_id]
+        job["status"] = status
+        job["resultado"] = resultado
+        job["erro"] = erro
+        job["concluido_em"] = time.time()
+        self.em_andamento.pop(job["chave"], None)
+
+    def _limpar_jobs_antigos(self):
+        agora = time.time()
+        expirados = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["concluido_em"] is not None and agora - job["concluido_em"] > TTL_JOBS_CONCLUIDOS
+        ]
+        for job_id in expirados:
+            del self.jobs[job_id]
+
+    async def _despachar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job_id = await self.fila.get()
+            job = self.jobs.get(job_id)
+
+            # Entrada obsoleta (job reenfileirado com outra prioridade ou já iniciado)
+            if job is None or job["status"] != "na_fila":
+                continue
+
+            job["status"] = "executando"
+            # Sem wait_for: o próprio B&B para ao atingir 'tempo_limite', e
+            # cancelar aqui não liberaria o worker (o processo seguiria ocupado).
+            try:
+                resultado = await loop.run_in_executor(self.pool, _resolver_job, job["params"])
+                self._finalizar(job_id, "concluido", resultado=resultado)
+            except Exception as e:
+                self._finalizar(job_id, "erro", erro=str(e))
+
+    async def iniciar(self):
+        # Um despachante por worker: no máximo n_workers jobs ocupam o pool
+        # e o restante espera na fila de prioridade.
+        self.despachantes = [
+            asyncio.create_task(self._despachar()) for _ in range(self.n_workers)
+        ]
+
+    def encerrar(self):
+        for tarefa in self.despachantes:
+            tarefa.cancel()
+        # Jobs em execução são interrompidos: sem isso o processo principal
+        # esperaria (até TEMPO_LIMITE_MAXIMO) os workers ocupados ao sair.
+        # ProcessPoolExecutor só expõe terminate_workers() a partir do Python 3.14.
+        if hasattr(self.pool, "terminate_workers"):
+            self.pool.terminate_workers()
+        else:
+            for processo in list((self.pool._processes or {}).values()):
+                processo.terminate()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # =====================================================================
+    # HTTP
+    # =====================================================================
+    async def tratar_conexao(self, reader, writer):
+        try:
+            linha = await reader.readline()
+            metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+
+            cabecalhos = {}
+            while True:
+                linha = await reader.readline()
+                if linha in (b"\r\n", b"\n", b""):
+                    break
+                nome, valor = linha.decode("latin-1").split(":", 1)
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+            corpo = b""
+            if "content-length" in cabecalhos:
+                corpo = await reader.readexactly(int(cabecalhos["content-length"]))
+
+            status, resposta = self._rotear(metodo, urlsplit(alvo).path, corpo)
+        except Exception as e:
+            status, resposta = 400, {"erro": f"Requisição inválida: {e}"}
+
+        try:
+            dados = json.dumps(resposta).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            status = 500
+            dados = json.dumps({"erro": f"Falha ao serializar a resposta: {e}"}).encode("utf-8")
+
+        try:
+            writer.write(
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'ERRO'}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(dados)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + dados
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def _rotear(self, metodo, caminho, corpo):
+        if metodo == "GET" and caminho == "/saude":
+            return 200, {"status": "ok", "workers": self.n_workers, "na_fila": self.fila.qsize()}
+
+        if metodo == "POST" and caminho == "/jobs":
+            try:
+                return 202, self.submeter(json.loads(corpo or b"{}"))
+            except (ValueError, TypeError) as e:
+                return 400, {"erro": str(e)}
+
+        if metodo == "GET" and caminho.startswith("/jobs/"):
+            job = self.consultar(caminho[len("/jobs/"):])
+            if job is None:
+                return 404, {"erro": "Job não encontrado."}
+            return 200, job
+
+        return 404, {"erro": f"Rota não encontrada: {metodo} {caminho}"}
+
+
+async def servir(host="127.0.0.1", porta=8765, caminho_matriz="matriz_custos.bin", n_workers=None):
+    servico = ServicoSolver(caminho_matriz, n_workers)
+    await servico.iniciar()
+
+    # SIGTERM/SIGINT encerram o servidor e o pool de forma ordenada
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except NotImplementedError:
+            pass  # Windows: só o KeyboardInterrupt do __main__
+
+    servidor = await asyncio.start_server(servico.tratar_conexao, host, porta)
+    print(f"Serviço do solver em http://{host}:{porta} ({servico.n_workers} workers)")
+    try:
+        async with servidor:
+            await parar.wait()
+    finally:
+        servico.encerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço local do solver Branch & Bound")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--matriz", default="matriz_custos.bin")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.matriz, args.workers))
+    except KeyboardInterrupt:
+        pass
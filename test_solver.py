@@ -1,8 +1,17 @@
 # test_solver.py
 
+import json
+import os
+import tempfile
+
 import pandas as pd
 import numpy as np
 from frente_2_bnb import rodar_branch_and_bound
+from indice_espacial import IndiceAeroportos
+from mapa_rota import arcos_grande_circulo, centro_geografico
+from matriz_custos import carregar_matriz_binaria, salvar_matriz_binaria
+import servico_solver
+from servico_solver import TTL_JOBS_CONCLUIDOS, ServicoSolver
 
 def criar_matriz_teste():
     """
@@ -55,6 +64,230 @@ def testar_solver(matriz_custos, aeroporto_inicio, tipo_busca, tempo_limite):
     print("=" * 25 + "\n")
     return resultado
 
+# Função auxiliar (recebe parâmetros), não é um teste do pytest
+testar_solver.__test__ = False
+
+def test_candidatos_em_grupos_separados():
+    """
+    Listas candidatas que separam o grafo em dois grupos ({A, B} e {C, D})
+    não podem impedir o B&B de fechar a rota: quando os candidatos acabam,
+    o solver volta a considerar todas as arestas.
+    """
+    matriz_teste = criar_matriz_teste()
+    candidatos = {'A': ['B'], 'B': ['A'], 'C': ['D'], 'D': ['C']}
+
+    for tipo_busca in ["Profundidade (DFS)", "Largura (BFS)", "Melhor-Primeiro (Best-First)"]:
+        resultado = rodar_branch_and_bound(matriz_teste, 'A', tipo_busca, 10, candidatos=candidatos)
+        assert resultado['custo'] == 80, tipo_busca
+        assert resultado['rota'].startswith('A -> B')
+
+def test_matriz_binaria_ida_e_volta():
+    """
+    Salva a matriz no formato binário (float64 e float32), abre via np.memmap
+    e confere valores (incluindo inf), IATAs e o modo somente leitura.
+    O B&B deve rodar direto sobre o DataFrame mapeado.
+    """
+    matriz_teste = criar_matriz_teste()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for dtype in [np.float64, np.float32]:
+            caminho = os.path.join(diretorio, f"matriz_{np.dtype(dtype).name}.bin")
+            salvar_matriz_binaria(matriz_teste, caminho, dtype=dtype)
+            umask = os.umask(0)
+            os.umask(umask)
+            assert os.stat(caminho).st_mode & 0o777 == 0o666 & ~umask
+            matriz = carregar_matriz_binaria(caminho)
+
+            assert matriz.index.tolist() == ['A', 'B', 'C', 'D']
+            assert matriz.columns.tolist() == ['A', 'B', 'C', 'D']
+            assert matriz.to_numpy().dtype == dtype
+            assert not matriz.to_numpy().flags.writeable
+            np.testing.assert_array_equal(matriz.to_numpy(), matriz_teste.to_numpy().astype(dtype))
+            assert np.isinf(np.diag(matriz.to_numpy())).all()
+
+            resultado = rodar_branch_and_bound(matriz, 'A', "Profundidade (DFS)", 10)
+            assert resultado['custo'] == 80
+
+            del matriz  # Libera o mapeamento antes de apagar o diretório
+
+def criar_indice_teste():
+    """
+    Índice espacial com quatro aeroportos conhecidos:
+    GRU e CGH (São Paulo, ~28 km entre si), GIG (Rio) e BSB (Brasília).
+    """
+    df_coords = pd.DataFrame(
+        {
+            "latitude": [-23.4356, -23.6261, -22.8100, -15.8711],
+            "longitude": [-46.4731, -46.6564, -43.2506, -47.9186],
+        },
+        index=['GRU', 'CGH', 'GIG', 'BSB'],
+    )
+    return IndiceAeroportos(df_coords)
+
+def test_indice_vizinhos_e_raio():
+    indice = criar_indice_teste()
+
+    vizinhos = indice.vizinhos_mais_proximos('GRU', k=2)
+    assert [iata for iata, _ in vizinhos] == ['CGH', 'GIG']
+    assert 25 < vizinhos[0][1] < 32
+
+    # Consulta por coordenadas não exclui ninguém
+    assert indice.vizinhos_mais_proximos((-23.4356, -46.4731), k=1)[0][0] == 'GRU'
+
+    no_raio = [iata for iata, _ in indice.aeroportos_no_raio('GRU', 50)]
+    assert no_raio == ['CGH']
+    assert {iata for iata, _ in indice.aeroportos_no_raio('GRU', 400)} == {'CGH', 'GIG'}
+
+    assert indice.listas_candidatas(['GRU', 'CGH', 'GIG'], k=1) == {
+        'GRU': ['CGH'], 'CGH': ['GRU'], 'GIG': ['GRU'],
+    }
+
+def test_indice_hubs():
+    indice = criar_indice_teste()
+
+    hub, distancia = indice.hub_mais_proximo('GRU', ['GRU', 'GIG'])
+    assert hub == 'GRU' and distancia == 0
+    assert indice.hub_mais_proximo('CGH', iter(['GIG', 'GRU']))[0] == 'GRU'
+    assert indice.ajustar_aos_hubs(['CGH', 'BSB'], ['GRU', 'GIG'])['CGH'][0] == 'GRU'
+
+    for hubs in [[], ['XXX']]:
+        try:
+            indice.hub_mais_proximo('GRU', hubs)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"hubs={hubs} deveria levantar ValueError")
+
+def test_servico_validacao_e_rotas():
+    """
+    Rotas HTTP do serviço chamadas direto (sem rede): entradas inválidas
+    viram 400 e jobs/rotas inexistentes viram 404.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "matriz.bin")
+        salvar_matriz_binaria(criar_matriz_teste(), caminho)
+        servico = ServicoSolver(caminho, n_workers=1)
+        try:
+            assert servico._rotear("GET", "/saude", b"")[0] == 200
+
+            invalidos = [
+                {"aeroporto_inicio": "XXX"},
+                {"aeroporto_inicio": "A", "tipo_busca": "Aleatória"},
+                {"aeroporto_inicio": "A", "tempo_limite": -5},
+                {"aeroporto_inicio": "A", "tempo_limite": 0},
+                {"aeroporto_inicio": "A", "tempo_limite": "abc"},
+                {"aeroporto_inicio": "A", "candidatos": ["B"]},
+                {"aeroporto_inicio": "A", "candidatos": {"A": "B"}},
+            ]
+            for dados in invalidos:
+                status, resposta = servico._rotear("POST", "/jobs", json.dumps(dados).encode())
+                assert status == 400, dados
+                assert "erro" in resposta
+
+            assert servico._rotear("POST", "/jobs", b"{nao e json")[0] == 400
+            assert servico._rotear("GET", "/jobs/inexistente", b"")[0] == 404
+            assert servico._rotear("DELETE", "/jobs", b"")[0] == 404
+
+            status, resposta = servico._rotear("POST", "/jobs", json.dumps({"aeroporto_inicio": "A", "tempo_limite": 1000}).encode())
+            assert status == 202
+            assert servico.jobs[resposta["job_id"]]["params"]["tempo_limite"] == servico_solver.TEMPO_LIMITE_MAXIMO
+        finally:
+            servico.encerrar()
+
+def test_servico_duplicados_prioridade_e_ttl():
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "matriz.bin")
+        salvar_matriz_binaria(criar_matriz_teste(), caminho)
+        servico = ServicoSolver(caminho, n_workers=1)
+        try:
+            dados = {"aeroporto_inicio": "A", "tipo_busca": "Largura (BFS)", "tempo_limite": 5, "prioridade": 10}
+
+            # Requisição idêntica em andamento reaproveita o mesmo job
+            primeiro = servico.submeter(dados)
+            segundo = servico.submeter(dados)
+            assert not primeiro["duplicado"] and segundo["duplicado"]
+            assert primeiro["job_id"] == segundo["job_id"]
+            assert servico.fila.qsize() == 1
+
+            # Duplicata mais urgente sobe a prioridade do job ainda na fila
+            servico.submeter(dict(dados, prioridade=1))
+            assert servico.consultar(primeiro["job_id"])["prioridade"] == 1
+            assert servico.fila.get_nowait()[0] == 1
+
+            # Parâmetros diferentes geram outro job
+            outro = servico.submeter(dict(dados, aeroporto_inicio="B"))
+            assert outro["job_id"] != primeiro["job_id"]
+
+            # Depois de concluído, a mesma requisição gera um job novo
+            servico._finalizar(primeiro["job_id"], "concluido", resultado={"custo": 80.0})
+            assert servico.consultar(primeiro["job_id"])["resultado"] == {"custo": 80.0}
+            novo = servico.submeter(dados)
+            assert novo["job_id"] != primeiro["job_id"] and not novo["duplicado"]
+
+            # Jobs concluídos há mais que o TTL são removidos na próxima submissão
+            servico.jobs[primeiro["job_id"]]["concluido_em"] -= TTL_JOBS_CONCLUIDOS + 1
+            servico.submeter(dict(dados, aeroporto_inicio="C"))
+            assert servico.consultar(primeiro["job_id"]) is None
+            assert servico.consultar(outro["job_id"]) is not None
+        finally:
+            servico.encerrar()
+
+def test_servico_resultado_serializavel_float32():
+    """
+    Com uma matriz float32, o resultado do worker precisa sair em tipos
+    Python puros para ser enviado em JSON.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "matriz.bin")
+        salvar_matriz_binaria(criar_matriz_teste(), caminho, dtype=np.float32)
+
+        servico_solver._iniciar_worker(caminho)
+        try:
+            params = {
+                "aeroporto_inicio": "A",
+                "tipo_busca": "Profundidade (DFS)",
+                "tempo_limite": 10,
+                "budget_inicial": float("inf"),
+                "candidatos": None,
+            }
+            resultado = servico_solver._resolver_job(params)
+            assert json.loads(json.dumps(resultado))["custo"] == 80
+            assert type(resultado["custo"]) is float
+            assert type(resultado["nos_explorados"]) is int
+        finally:
+            servico_solver._MATRIZ = None  # Libera o mapeamento antes de apagar o diretório
+
+def test_arcos_rota_pelo_pacifico():
+    """
+    HND -> LAX -> HND cruza o antimeridiano duas vezes: a linha deve ficar em
+    [-180, 180], ser quebrada em ±180 com a mesma latitude dos dois lados e
+    começar/terminar exatamente nos aeroportos (mesmo "mundo" dos marcadores).
+    """
+    hnd, lax = [35.5523, 139.7800], [33.9425, -118.4081]
+    coords = [hnd, lax, hnd]
+
+    for zoom in [1, 3, 6]:
+        segmentos = arcos_grande_circulo(coords, zoom)
+        assert len(segmentos) == 3, zoom
+
+        todos = np.vstack(segmentos)
+        assert (np.abs(todos[:, 1]) <= 180).all()
+        np.testing.assert_allclose(segmentos[0][0], hnd, atol=1e-9)
+        np.testing.assert_allclose(segmentos[-1][-1], hnd, atol=1e-9)
+        # O pedaço do meio (-180 -> LAX -> -180) passa exatamente por LAX
+        assert np.isclose(segmentos[1], lax, atol=1e-9).all(axis=1).any()
+
+        for anterior, seguinte in zip(segmentos[:-1], segmentos[1:]):
+            if abs(anterior[-1][1]) == 180:
+                assert seguinte[0][1] == -anterior[-1][1]
+                assert seguinte[0][0] == anterior[-1][0]
+                # Cruzamento pelo norte do Pacífico, entre as latitudes das pontas
+                assert 33 < anterior[-1][0] < 60
+
+    # Centro no Pacífico, não sobre a África
+    lat_centro, lon_centro = centro_geografico(coords)
+    assert abs(lon_centro) > 150 and 30 < lat_centro < 60
+
 if __name__ == "__main__":
     # 1. Criar os dados de teste
     matriz_teste = criar_matriz_teste()
@@ -75,4 +308,27 @@ if __name__ == "__main__":
     
     # Teste 4: Começando de um aeroporto diferente
     print("Testando com aeroporto inicial 'C'...")
-    testar_solver(matriz_teste, 'C', "Profundidade (DFS)", limite_tempo)
\ No newline at end of file
+    testar_solver(matriz_teste, 'C', "Profundidade (DFS)", limite_tempo)
+
+    # Teste 5: Listas candidatas (k-NN) separadas em grupos
+    test_candidatos_em_grupos_separados()
+    print("Teste com listas candidatas: OK")
+
+    # Teste 6: Formato binário da matriz (np.memmap)
+    test_matriz_binaria_ida_e_volta()
+    print("Teste da matriz binária: OK")
+
+    # Teste 7: Índice espacial (k-NN, raio e hubs)
+    test_indice_vizinhos_e_raio()
+    test_indice_hubs()
+    print("Teste do índice espacial: OK")
+
+    # Teste 8: Serviço do solver (sem rede)
+    test_servico_validacao_e_rotas()
+    test_servico_duplicados_prioridade_e_ttl()
+    test_servico_resultado_serializavel_float32()
+    print("Teste do serviço do solver: OK")
+
+    # Teste 9: Geometria do mapa (antimeridiano)
+    test_arcos_rota_pelo_pacifico()
+    print("Teste da geometria do mapa: OK")
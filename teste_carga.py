@@ -0,0 +1,60 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cliente_solver import URL_SERVICO, resolver_remoto
+from servico_solver import TIPOS_BUSCA
+
+
+def rodar_teste_carga(aeroportos, n_requisicoes=50, concorrencia=10, tempo_limite=10, url_servico=URL_SERVICO):
+    """
+    Dispara 'n_requisicoes' jobs com até 'concorrencia' clientes simultâneos
+    e mede vazão (jobs/s) e latências (média, p50, p95) do serviço.
+    """
+    rng = np.random.default_rng(0)
+    cargas = [
+        (str(rng.choice(aeroportos)), TIPOS_BUSCA[i % len(TIPOS_BUSCA)], int(rng.integers(0, 20)))
+        for i in range(n_requisicoes)
+    ]
+
+    def cliente(carga):
+        aeroporto_inicio, tipo_busca, prioridade = carga
+        inicio = time.perf_counter()
+        # Sem limite de espera na fila: o teste mede a latência real sob carga
+        resolver_remoto(aeroporto_inicio, tipo_busca, tempo_limite, prioridade=prioridade, espera_fila=float("inf"), url_servico=url_servico)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        latencias = np.array(list(executor.map(cliente, cargas)))
+    tempo_total = time.perf_counter() - inicio
+
+    print("--- Teste de Carga do Serviço do Solver ---")
+    print(f"Requisições: {n_requisicoes} | Clientes simultâneos: {concorrencia}")
+    print(f"Tempo total: {tempo_total:.2f}s | Vazão: {n_requisicoes / tempo_total:.2f} jobs/s")
+    print(f"Latência média: {latencias.mean():.3f}s | p50: {np.percentile(latencias, 50):.3f}s | p95: {np.percentile(latencias, 95):.3f}s")
+
+    return {
+        "tempo_total": tempo_total,
+        "vazao": n_requisicoes / tempo_total,
+        "latencia_media": latencias.mean(),
+        "p50": np.percentile(latencias, 50),
+        "p95": np.percentile(latencias, 95),
+    }
+
+
+if __name__ == "__main__":
+    from matriz_custos import carregar_matriz_binaria
+
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço do solver")
+    parser.add_argument("--requisicoes", type=int, default=50)
+    parser.add_argument("--concorrencia", type=int, default=10)
+    parser.add_argument("--tempo-limite", type=int, default=10)
+    parser.add_argument("--matriz", default="matriz_custos.bin")
+    parser.add_argument("--url", default=URL_SERVICO)
+    args = parser.parse_args()
+
+    aeroportos = carregar_matriz_binaria(args.matriz).index.tolist()
+    rodar_teste_carga(aeroportos, args.requisicoes, args.concorrencia, args.tempo_limite, args.url)